@@ -13,18 +13,14 @@ from sqlglot.dialects.dialect import (
     unit_to_str,
 )
 from sqlglot.dialects.hive import Hive
+from sqlglot.generator import Generator
 from sqlglot.helper import seq_get
-from sqlglot.transforms import (
-    preprocess,
-    remove_unique_constraints,
-    ctas_with_tmp_tables_to_create_tmp_view,
-    move_schema_columns_to_partitioned_by,
-)
 
 
 def _map_sql(self: Spark2.Generator, expression: exp.Map) -> str:
-    keys = expression.args.get("keys")
-    values = expression.args.get("values")
+    args = expression.args
+    keys = args.get("keys")
+    values = args.get("values")
 
     if not keys or not values:
         return self.func("MAP")
@@ -33,7 +29,75 @@ def _map_sql(self: Spark2.Generator, expression: exp.Map) -> str:
 
 
 def _build_as_cast(to_type: str) -> t.Callable[[t.List], exp.Expression]:
-    return lambda args: exp.Cast(this=seq_get(args, 0), to=exp.DataType.build(to_type))
+    # The DataType can't be built eagerly because that would cause a circular
+    # import at module load time, so it's resolved on the first call and reused
+    data_type: t.Optional[exp.DataType] = None
+
+    def _builder(args: t.List) -> exp.Expression:
+        nonlocal data_type
+        if data_type is None:
+            data_type = exp.DataType.build(to_type)
+
+        return exp.Cast(this=seq_get(args, 0), to=data_type.copy())
+
+    return _builder
+
+
+def _build_utc_timestamp_conversion(
+    expr_type: t.Type[exp.Expression],
+) -> t.Callable[[t.List], exp.Expression]:
+    def _builder(args: t.List) -> exp.Expression:
+        return expr_type(
+            this=exp.cast(seq_get(args, 0) or exp.Var(this=""), exp.DataType.Type.TIMESTAMP),
+            zone=seq_get(args, 1),
+        )
+
+    return _builder
+
+
+def _build_to_timestamp(args: t.List) -> exp.Expression:
+    if len(args) == 1:
+        return _timestamp_cast(args)
+
+    return _formatted_str_to_time(args)
+
+
+_timestamp_cast = _build_as_cast("timestamp")
+_formatted_str_to_time = build_formatted_time(exp.StrToTime, "spark")
+
+
+def _array_sum_sql(self: Spark2.Generator, expression: exp.ArraySum) -> str:
+    return f"AGGREGATE({self.sql(expression, 'this')}, 0, (acc, x) -> acc + x, acc -> acc)"
+
+
+def _at_time_zone_sql(self: Spark2.Generator, expression: exp.AtTimeZone) -> str:
+    return self.func("FROM_UTC_TIMESTAMP", expression.this, expression.args.get("zone"))
+
+
+def _from_time_zone_sql(self: Spark2.Generator, expression: exp.FromTimeZone) -> str:
+    return self.func("TO_UTC_TIMESTAMP", expression.this, expression.args.get("zone"))
+
+
+def _date_trunc_sql(self: Spark2.Generator, expression: exp.DateTrunc) -> str:
+    return self.func("TRUNC", expression.this, unit_to_str(expression))
+
+
+def _timestamp_trunc_sql(self: Spark2.Generator, expression: exp.TimestampTrunc) -> str:
+    return self.func("DATE_TRUNC", unit_to_str(expression), expression.this)
+
+
+def _regexp_replace_sql(self: Spark2.Generator, expression: exp.RegexpReplace) -> str:
+    return self.func(
+        "REGEXP_REPLACE",
+        expression.this,
+        expression.expression,
+        expression.args["replacement"],
+        expression.args.get("position"),
+    )
+
+
+def _str_to_time_sql(self: Spark2.Generator, expression: exp.StrToTime) -> str:
+    return self.func("TO_TIMESTAMP", expression.this, self.format_time(expression))
 
 
 def _str_to_date(self: Spark2.Generator, expression: exp.StrToDate) -> str:
@@ -43,18 +107,25 @@ def _str_to_date(self: Spark2.Generator, expression: exp.StrToDate) -> str:
     return self.func("TO_DATE", expression.this, time_format)
 
 
+JSON_EXTRACT_EXPRESSIONS = (exp.JSONExtract, exp.JSONExtractScalar)
+
+UNIX_TO_TIME_FUNCS = {
+    exp.UnixToTime.SECONDS: "TIMESTAMP_SECONDS",
+    exp.UnixToTime.MILLIS: "TIMESTAMP_MILLIS",
+    exp.UnixToTime.MICROS: "TIMESTAMP_MICROS",
+}
+
+
 def _unix_to_time_sql(self: Spark2.Generator, expression: exp.UnixToTime) -> str:
     scale = expression.args.get("scale")
     timestamp = expression.this
 
     if scale is None:
         return self.sql(exp.cast(exp.func("from_unixtime", timestamp), exp.DataType.Type.TIMESTAMP))
-    if scale == exp.UnixToTime.SECONDS:
-        return self.func("TIMESTAMP_SECONDS", timestamp)
-    if scale == exp.UnixToTime.MILLIS:
-        return self.func("TIMESTAMP_MILLIS", timestamp)
-    if scale == exp.UnixToTime.MICROS:
-        return self.func("TIMESTAMP_MICROS", timestamp)
+
+    timestamp_func = UNIX_TO_TIME_FUNCS.get(scale)
+    if timestamp_func:
+        return self.func(timestamp_func, timestamp)
 
     unix_seconds = exp.Div(this=timestamp, expression=exp.func("POW", 10, scale))
     return self.func("TIMESTAMP_SECONDS", unix_seconds)
@@ -75,12 +146,11 @@ def _unalias_pivot(expression: exp.Expression) -> exp.Expression:
         pivot = expression.this.args["pivots"][0]
         if pivot.alias:
             alias = pivot.args["alias"].pop()
-            return exp.From(
-                this=expression.this.replace(
-                    exp.select("*")
-                    .from_(expression.this.copy(), copy=False)
-                    .subquery(alias=alias, copy=False)
-                )
+            expression.set(
+                "this",
+                exp.select("*")
+                .from_(expression.this, copy=False)
+                .subquery(alias=alias, copy=False),
             )
 
     return expression
@@ -98,7 +168,9 @@ def _unqualify_pivot_columns(expression: exp.Expression) -> exp.Expression:
         SELECT * FROM tbl PIVOT(SUM(tbl.sales) FOR quarter IN ('Q1', 'Q1'))
     """
     if isinstance(expression, exp.Pivot):
-        expression.set("field", transforms.unqualify_columns(expression.args["field"]))
+        field = expression.args.get("field")
+        if field:
+            transforms.unqualify_columns(field)
 
     return expression
 
@@ -110,6 +182,12 @@ def temporary_storage_provider(expression: exp.Expression) -> exp.Expression:
     return expression
 
 
+def _annotate_temporary_storage_provider(expression: exp.Expression) -> exp.Expression:
+    return transforms.ctas_with_tmp_tables_to_create_tmp_view(
+        expression, temporary_storage_provider
+    )
+
+
 class Spark2(Hive):
     class Parser(Hive.Parser):
         TRIM_PATTERN_FIRST = True
@@ -128,10 +206,7 @@ class Spark2(Hive):
             "DAYOFYEAR": lambda args: exp.DayOfYear(this=exp.TsOrDsToDate(this=seq_get(args, 0))),
             "DOUBLE": _build_as_cast("double"),
             "FLOAT": _build_as_cast("float"),
-            "FROM_UTC_TIMESTAMP": lambda args: exp.AtTimeZone(
-                this=exp.cast(seq_get(args, 0) or exp.Var(this=""), exp.DataType.Type.TIMESTAMP),
-                zone=seq_get(args, 1),
-            ),
+            "FROM_UTC_TIMESTAMP": _build_utc_timestamp_conversion(exp.AtTimeZone),
             "INT": _build_as_cast("int"),
             "MAP_FROM_ARRAYS": exp.Map.from_arg_list,
             "RLIKE": exp.RegexpLike.from_arg_list,
@@ -139,16 +214,9 @@ class Spark2(Hive):
             "SHIFTRIGHT": binary_from_function(exp.BitwiseRightShift),
             "STRING": _build_as_cast("string"),
             "TIMESTAMP": _build_as_cast("timestamp"),
-            "TO_TIMESTAMP": lambda args: (
-                _build_as_cast("timestamp")(args)
-                if len(args) == 1
-                else build_formatted_time(exp.StrToTime, "spark")(args)
-            ),
+            "TO_TIMESTAMP": _build_to_timestamp,
             "TO_UNIX_TIMESTAMP": exp.StrToUnix.from_arg_list,
-            "TO_UTC_TIMESTAMP": lambda args: exp.FromTimeZone(
-                this=exp.cast(seq_get(args, 0) or exp.Var(this=""), exp.DataType.Type.TIMESTAMP),
-                zone=seq_get(args, 1),
-            ),
+            "TO_UTC_TIMESTAMP": _build_utc_timestamp_conversion(exp.FromTimeZone),
             "TRUNC": lambda args: exp.DateTrunc(unit=seq_get(args, 1), this=seq_get(args, 0)),
             "WEEKOFYEAR": lambda args: exp.WeekOfYear(this=exp.TsOrDsToDate(this=seq_get(args, 0))),
         }
@@ -194,48 +262,35 @@ class Spark2(Hive):
         TRANSFORMS = {
             **Hive.Generator.TRANSFORMS,
             exp.ApproxDistinct: rename_func("APPROX_COUNT_DISTINCT"),
-            exp.ArraySum: lambda self,
-            e: f"AGGREGATE({self.sql(e, 'this')}, 0, (acc, x) -> acc + x, acc -> acc)",
+            exp.ArraySum: _array_sum_sql,
             exp.ArrayToString: rename_func("ARRAY_JOIN"),
-            exp.AtTimeZone: lambda self, e: self.func(
-                "FROM_UTC_TIMESTAMP", e.this, e.args.get("zone")
-            ),
+            exp.AtTimeZone: _at_time_zone_sql,
             exp.BitwiseLeftShift: rename_func("SHIFTLEFT"),
             exp.BitwiseRightShift: rename_func("SHIFTRIGHT"),
-            exp.Create: preprocess(
+            exp.Create: transforms.preprocess(
                 [
-                    remove_unique_constraints,
-                    lambda e: ctas_with_tmp_tables_to_create_tmp_view(
-                        e, temporary_storage_provider
-                    ),
-                    move_schema_columns_to_partitioned_by,
+                    transforms.remove_unique_constraints,
+                    _annotate_temporary_storage_provider,
+                    transforms.move_schema_columns_to_partitioned_by,
                 ]
             ),
             exp.DateFromParts: rename_func("MAKE_DATE"),
-            exp.DateTrunc: lambda self, e: self.func("TRUNC", e.this, unit_to_str(e)),
+            exp.DateTrunc: _date_trunc_sql,
             exp.DayOfMonth: rename_func("DAYOFMONTH"),
             exp.DayOfWeek: rename_func("DAYOFWEEK"),
             exp.DayOfYear: rename_func("DAYOFYEAR"),
             exp.FileFormatProperty: lambda self, e: f"USING {e.name.upper()}",
             exp.From: transforms.preprocess([_unalias_pivot]),
-            exp.FromTimeZone: lambda self, e: self.func(
-                "TO_UTC_TIMESTAMP", e.this, e.args.get("zone")
-            ),
+            exp.FromTimeZone: _from_time_zone_sql,
             exp.LogicalAnd: rename_func("BOOL_AND"),
             exp.LogicalOr: rename_func("BOOL_OR"),
             exp.Map: _map_sql,
             exp.Pivot: transforms.preprocess([_unqualify_pivot_columns]),
             exp.Reduce: rename_func("AGGREGATE"),
-            exp.RegexpReplace: lambda self, e: self.func(
-                "REGEXP_REPLACE",
-                e.this,
-                e.expression,
-                e.args["replacement"],
-                e.args.get("position"),
-            ),
+            exp.RegexpReplace: _regexp_replace_sql,
             exp.StrToDate: _str_to_date,
-            exp.StrToTime: lambda self, e: self.func("TO_TIMESTAMP", e.this, self.format_time(e)),
-            exp.TimestampTrunc: lambda self, e: self.func("DATE_TRUNC", unit_to_str(e), e.this),
+            exp.StrToTime: _str_to_time_sql,
+            exp.TimestampTrunc: _timestamp_trunc_sql,
             exp.Trim: trim_sql,
             exp.UnixToTime: _unix_to_time_sql,
             exp.VariancePop: rename_func("VAR_POP"),
@@ -254,18 +309,18 @@ class Spark2(Hive):
         CREATE_FUNCTION_RETURN_AS = False
 
         def struct_sql(self, expression: exp.Struct) -> str:
-            from sqlglot.generator import Generator
-
             return Generator.struct_sql(self, expression)
 
         def cast_sql(self, expression: exp.Cast, safe_prefix: t.Optional[str] = None) -> str:
             arg = expression.this
-            is_json_extract = isinstance(arg, (exp.JSONExtract, exp.JSONExtractScalar))
 
-            # We can't use a non-nested type (eg. STRING) as a schema
-            if expression.to.args.get("nested") and (is_parse_json(arg) or is_json_extract):
-                schema = f"'{self.sql(expression, 'to')}'"
-                return self.func("FROM_JSON", arg if is_json_extract else arg.this, schema)
+            if expression.to.args.get("nested"):
+                is_json_extract = isinstance(arg, JSON_EXTRACT_EXPRESSIONS)
+
+                # We can't use a non-nested type (eg. STRING) as a schema
+                if is_json_extract or is_parse_json(arg):
+                    schema = f"'{self.sql(expression, 'to')}'"
+                    return self.func("FROM_JSON", arg if is_json_extract else arg.this, schema)
 
             if is_parse_json(expression):
                 return self.func("TO_JSON", arg)
@@ -14,6 +14,12 @@ logger = logging.getLogger("sqlglot")
 
 TRAVERSABLES = (exp.Query, exp.DDL, exp.DML)
 
+# Parent types under which a derived table or UDTF acts as a source,
+# i.e. starts a new scope
+SOURCE_PARENTS = (exp.From, exp.Join, exp.Subquery)
+
+COLUMN_ANCESTORS = (exp.Select, exp.Qualify, exp.Order, exp.Having, exp.Hint, exp.Table, exp.Star)
+
 
 class ScopeType(Enum):
     ROOT = auto()
@@ -56,6 +62,36 @@ class Scope:
             a list of the left and right child scopes.
     """
 
+    __slots__ = (
+        "expression",
+        "sources",
+        "lateral_sources",
+        "cte_sources",
+        "outer_columns",
+        "parent",
+        "scope_type",
+        "subquery_scopes",
+        "derived_table_scopes",
+        "table_scopes",
+        "cte_scopes",
+        "union_scopes",
+        "udtf_scopes",
+        "_collected",
+        "_raw_columns",
+        "_stars",
+        "_derived_tables",
+        "_udtfs",
+        "_tables",
+        "_ctes",
+        "_subqueries",
+        "_selected_sources",
+        "_columns",
+        "_external_columns",
+        "_join_hints",
+        "_pivots",
+        "_references",
+    )
+
     def __init__(
         self,
         expression,
@@ -108,46 +144,52 @@ class Scope:
             sources=sources.copy() if sources else None,
             parent=self,
             scope_type=scope_type,
-            cte_sources={**self.cte_sources, **(cte_sources or {})},
+            cte_sources={**self.cte_sources, **cte_sources}
+            if cte_sources
+            else self.cte_sources.copy(),
             lateral_sources=lateral_sources.copy() if lateral_sources else None,
             **kwargs,
         )
 
     def _collect(self):
-        self._tables = []
-        self._ctes = []
-        self._subqueries = []
-        self._derived_tables = []
-        self._udtfs = []
-        self._raw_columns = []
-        self._stars = []
-        self._join_hints = []
-
-        for node in self.walk(bfs=False):
-            if node is self.expression:
+        self._tables = tables = []
+        self._ctes = ctes = []
+        self._subqueries = subqueries = []
+        self._derived_tables = derived_tables = []
+        self._udtfs = udtfs = []
+        self._raw_columns = raw_columns = []
+        self._stars = stars = []
+        self._join_hints = join_hints = []
+
+        expression = self.expression
+
+        for node in walk_in_scope(expression, bfs=False):
+            if node is expression:
                 continue
 
-            if isinstance(node, exp.Dot) and node.is_star:
-                self._stars.append(node)
-            elif isinstance(node, exp.Column):
+            # The branches are ordered by how frequently each node type shows up
+            # in a typical query, so most nodes take as few isinstance checks
+            # as possible. They are mutually exclusive, so order is otherwise
+            # irrelevant
+            if isinstance(node, exp.Column):
                 if isinstance(node.this, exp.Star):
-                    self._stars.append(node)
+                    stars.append(node)
                 else:
-                    self._raw_columns.append(node)
+                    raw_columns.append(node)
             elif isinstance(node, exp.Table) and not isinstance(node.parent, exp.JoinHint):
-                self._tables.append(node)
-            elif isinstance(node, exp.JoinHint):
-                self._join_hints.append(node)
-            elif isinstance(node, exp.UDTF):
-                self._udtfs.append(node)
-            elif isinstance(node, exp.CTE):
-                self._ctes.append(node)
-            elif _is_derived_table(node) and isinstance(
-                node.parent, (exp.From, exp.Join, exp.Subquery)
-            ):
-                self._derived_tables.append(node)
+                tables.append(node)
+            elif isinstance(node, exp.Dot) and node.is_star:
+                stars.append(node)
             elif isinstance(node, exp.UNWRAPPED_QUERIES):
-                self._subqueries.append(node)
+                subqueries.append(node)
+            elif isinstance(node, exp.CTE):
+                ctes.append(node)
+            elif isinstance(node, exp.UDTF):
+                udtfs.append(node)
+            elif isinstance(node, exp.JoinHint):
+                join_hints.append(node)
+            elif _is_derived_table(node) and isinstance(node.parent, SOURCE_PARENTS):
+                derived_tables.append(node)
 
         self._collected = True
 
@@ -265,27 +307,51 @@ class Scope:
                 for column in scope.external_columns
             ]
 
-            named_selects = set(self.expression.named_selects)
+            # Only built if a column under an ORDER BY actually needs it
+            named_selects = None
+
+            # Columns that hang off of the same subtree share the ancestor walk,
+            # so each node traversed on the way up is mapped to the ancestor that
+            # was ultimately found above it and later walks stop at the first hit
+            ancestors: t.Dict[int, t.Optional[exp.Expression]] = {}
 
-            self._columns = []
+            self._columns = in_scope = []
             for column in columns + external_columns:
-                ancestor = column.find_ancestor(
-                    exp.Select, exp.Qualify, exp.Order, exp.Having, exp.Hint, exp.Table, exp.Star
-                )
+                if column.table:
+                    # Qualified columns are always in scope, no need to find an ancestor
+                    in_scope.append(column)
+                    continue
+
+                node = column.parent
+                path = []
+
+                while node and not isinstance(node, COLUMN_ANCESTORS):
+                    key = id(node)
+                    if key in ancestors:
+                        node = ancestors[key]
+                        break
+                    path.append(key)
+                    node = node.parent
+
+                ancestor = node
+                for key in path:
+                    ancestors[key] = ancestor
+
                 if (
                     not ancestor
-                    or column.table
                     or isinstance(ancestor, exp.Select)
                     or (isinstance(ancestor, exp.Table) and not isinstance(ancestor.this, exp.Func))
-                    or (
-                        isinstance(ancestor, exp.Order)
-                        and (
-                            isinstance(ancestor.parent, exp.Window)
-                            or column.name not in named_selects
-                        )
-                    )
                 ):
-                    self._columns.append(column)
+                    in_scope.append(column)
+                elif isinstance(ancestor, exp.Order):
+                    if isinstance(ancestor.parent, exp.Window):
+                        in_scope.append(column)
+                    else:
+                        if named_selects is None:
+                            named_selects = set(self.expression.named_selects)
+
+                        if column.name not in named_selects:
+                            in_scope.append(column)
 
         return self._columns
 
@@ -302,12 +368,13 @@ class Scope:
         """
         if self._selected_sources is None:
             result = {}
+            sources = self.sources
 
             for name, node in self.references:
                 if name in result:
                     raise OptimizeError(f"Alias already used: {name}")
-                if name in self.sources:
-                    result[name] = (node, self.sources[name])
+                if name in sources:
+                    result[name] = (node, sources[name])
 
             self._selected_sources = result
         return self._selected_sources
@@ -315,12 +382,12 @@ class Scope:
     @property
     def references(self) -> t.List[t.Tuple[str, exp.Expression]]:
         if self._references is None:
-            self._references = []
+            self._references = references = []
 
             for table in self.tables:
-                self._references.append((table.alias_or_name, table))
+                references.append((table.alias_or_name, table))
             for expression in itertools.chain(self.derived_tables, self.udtfs):
-                self._references.append(
+                references.append(
                     (
                         expression.alias,
                         expression if expression.args.get("pivots") else expression.unnest(),
@@ -424,10 +491,21 @@ class Scope:
     @property
     def is_correlated_subquery(self):
         """Determine if this scope is a correlated subquery"""
-        return bool(
-            (self.is_subquery or (self.parent and isinstance(self.parent.expression, exp.Lateral)))
-            and self.external_columns
-        )
+        if not (
+            self.is_subquery or (self.parent and isinstance(self.parent.expression, exp.Lateral))
+        ):
+            return False
+
+        if self._external_columns is not None:
+            return bool(self._external_columns)
+
+        if isinstance(self.expression, exp.SetOperation):
+            return bool(self.external_columns)
+
+        # Only existence matters here, so bail on the first external column
+        # instead of materializing the full cached list
+        selected_sources = self.selected_sources
+        return any(column.table not in selected_sources for column in self.columns)
 
     def rename_source(self, old_name, new_name):
         """Rename a source in this scope"""
@@ -454,21 +532,27 @@ class Scope:
         Yields:
             Scope: scope instances in depth-first-search post-order
         """
-        stack = [self]
-        result = []
+        stack = [(self, False)]
+
         while stack:
-            scope = stack.pop()
-            result.append(scope)
-            stack.extend(
-                itertools.chain(
-                    scope.cte_scopes,
-                    scope.union_scopes,
-                    scope.table_scopes,
-                    scope.subquery_scopes,
-                )
-            )
+            scope, entered = stack.pop()
 
-        yield from reversed(result)
+            if entered:
+                yield scope
+                continue
+
+            stack.append((scope, True))
+
+            # Child groups are pushed in reverse so that they're emitted in the
+            # order they appear in the scope, i.e. CTEs first, subqueries last
+            for child_scopes in (
+                scope.subquery_scopes,
+                scope.table_scopes,
+                scope.union_scopes,
+                scope.cte_scopes,
+            ):
+                for child_scope in reversed(child_scopes):
+                    stack.append((child_scope, False))
 
     def ref_count(self):
         """
@@ -477,7 +561,7 @@ class Scope:
         Returns:
             dict[int, int]: Mapping of Scope instance ID to reference count
         """
-        scope_ref_count = defaultdict(lambda: 0)
+        scope_ref_count = defaultdict(int)
 
         for scope in self.traverse():
             for _, source in scope.selected_sources.values():
@@ -793,9 +877,17 @@ def walk_in_scope(expression, bfs=True, prune=None):
     # Whenever we set it to True, we exclude a subtree from traversal.
     crossed_scope_boundary = False
 
-    for node in expression.walk(
-        bfs=bfs, prune=lambda n: crossed_scope_boundary or (prune and prune(n))
-    ):
+    if prune:
+
+        def _prune(n):
+            return crossed_scope_boundary or prune(n)
+
+    else:
+
+        def _prune(n):
+            return crossed_scope_boundary
+
+    for node in expression.walk(bfs=bfs, prune=_prune):
         crossed_scope_boundary = False
 
         yield node
@@ -805,7 +897,7 @@ def walk_in_scope(expression, bfs=True, prune=None):
         if (
             isinstance(node, exp.CTE)
             or (
-                isinstance(node.parent, (exp.From, exp.Join, exp.Subquery))
+                isinstance(node.parent, SOURCE_PARENTS)
                 and (_is_derived_table(node) or isinstance(node, exp.UDTF))
             )
             or isinstance(node, exp.UNWRAPPED_QUERIES)
@@ -834,8 +926,10 @@ def find_all_in_scope(expression, expression_types, bfs=True):
     Yields:
         exp.Expression: nodes
     """
+    expression_types = tuple(ensure_collection(expression_types))
+
     for expression in walk_in_scope(expression, bfs=bfs):
-        if isinstance(expression, tuple(ensure_collection(expression_types))):
+        if isinstance(expression, expression_types):
             yield expression
 
 
@@ -854,4 +948,10 @@ def find_in_scope(expression, expression_types, bfs=True):
         exp.Expression: the node which matches the criteria or None if no node matching
         the criteria was found.
     """
-    return next(find_all_in_scope(expression, expression_types, bfs=bfs), None)
+    expression_types = tuple(ensure_collection(expression_types))
+
+    for node in walk_in_scope(expression, bfs=bfs):
+        if isinstance(node, expression_types):
+            return node
+
+    return None
@@ -17,6 +17,11 @@ from sqlglot.parser import logger as parser_logger
 class Validator(unittest.TestCase):
     dialect = None
 
+    @classmethod
+    def setUpClass(cls):
+        # Resolve the dialect once per class instead of once per validation
+        cls.dialect = Dialect.get_or_raise(cls.dialect)
+
     def parse_one(self, sql, **kwargs):
         return parse_one(sql, read=self.dialect, **kwargs)
 
@@ -794,10 +794,10 @@ TBLPROPERTIES (
         with_modifiers = f"{without_modifiers} CLUSTER BY y DISTRIBUTE BY x SORT BY z"
         query = self.parse_one(with_modifiers)
 
+        keep_modifiers = ("", "databricks", "hive", "spark", "spark2")
+
         for dialect in Dialects:
             with self.subTest(f"Transpiling query with CLUSTER/DISTRIBUTE/SORT BY to {dialect}"):
                 name = dialect.value
-                if name in ("", "databricks", "hive", "spark", "spark2"):
-                    self.assertEqual(query.sql(name), with_modifiers)
-                else:
-                    self.assertEqual(query.sql(name), without_modifiers)
+                expected = with_modifiers if name in keep_modifiers else without_modifiers
+                self.assertEqual(query.sql(name), expected)